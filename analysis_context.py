@@ -0,0 +1,78 @@
+# analysis_context.py - Per-request preprocessing shared by all stages
+import re
+
+_TOKEN_RE = re.compile(r"\w+(?:['’]\w+)*")
+# A sentence ends at terminal punctuation, a line break or the end of text
+_SENTENCE_RE = re.compile(r'[^.!?\n]+[.!?]*')
+
+
+class AnalysisContext:
+    """
+    Text plus everything derived from it, built once per request.
+    Tokens, sentences and the embedding are computed on first use.
+    """
+
+    __slots__ = ('text', 'lower', '_tokens', '_sentences', '_embedding')
+
+    def __init__(self, text):
+        self.text = text
+        self.lower = text.lower()
+        self._tokens = None
+        self._sentences = None
+        self._embedding = None
+
+    @classmethod
+    def of(cls, text_or_context):
+        """Accept either raw text or an existing context"""
+        if isinstance(text_or_context, cls):
+            return text_or_context
+        return cls(text_or_context)
+
+    @property
+    def tokens(self):
+        """(start, end) offsets of word tokens in the original text"""
+        if self._tokens is None:
+            # Not self.lower: lowercasing can change the length ('İ' -> 'i̇')
+            self._tokens = [m.span() for m in _TOKEN_RE.finditer(self.text)]
+        return self._tokens
+
+    @property
+    def sentences(self):
+        """(start, end) offsets of sentences, whitespace trimmed"""
+        if self._sentences is None:
+            spans = []
+            for m in _SENTENCE_RE.finditer(self.text):
+                start, end = m.span()
+                chunk = m.group()
+                start += len(chunk) - len(chunk.lstrip())
+                end -= len(chunk) - len(chunk.rstrip())
+                if start < end:
+                    spans.append((start, end))
+            self._sentences = spans
+        return self._sentences
+
+    def windows(self, size, stride):
+        """
+        (start, end) character spans of overlapping windows of `size`
+        tokens, advancing `stride` tokens at a time. Short texts give a
+        single window covering everything. Stride is clamped to `size` so
+        no token falls between windows.
+        """
+        stride = max(1, min(stride, size))
+        tokens = self.tokens
+        if len(tokens) <= size:
+            return [(0, len(self.text))]
+
+        spans = []
+        for first in range(0, len(tokens) - size + stride, stride):
+            last = min(first + size, len(tokens)) - 1
+            spans.append((tokens[first][0], tokens[last][1]))
+            if last == len(tokens) - 1:
+                break
+        return spans
+
+    def embedding(self, model):
+        """Sentence embedding of the whole text, encoded at most once"""
+        if self._embedding is None:
+            self._embedding = model.encode(self.text, convert_to_tensor=True)
+        return self._embedding
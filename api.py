@@ -1,24 +1,72 @@
 # api.py - Flask REST API
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 from bias_detector import BiasDetector
 from bias_corrector import BiasCorrectorAI
 from training_system import BiasTrainingSystem
+from analysis_context import AnalysisContext
+from jobs import JobManager
+from request_log import RequestLogger
+from response_format import (RESPONSE_VERSION, bias_type_for_code, encode,
+                             negotiate, slim_correction)
+import hmac
 import logging
+import os
+import threading
+import time
 from datetime import datetime
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for React frontend
 
-# Initialize components
+# Initialize components (load the embedding model now, not on the first request)
 detector = BiasDetector()
+detector.load_semantic_model()
 corrector = BiasCorrectorAI()
 trainer = BiasTrainingSystem()
+# Guards the shared trainer and writes to the training data file
+trainer_lock = threading.Lock()
+
+# Largest synthetic generation accepted in one request or job
+MAX_GENERATE_EXAMPLES = 100000
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Registering named pattern sets needs this token in X-Admin-Token;
+# registration is disabled when it is not set
+PATTERN_ADMIN_TOKEN = os.environ.get('PATTERN_ADMIN_TOKEN')
+
+# Request/result log, written by a background thread. Set include_text=True
+# to record raw texts (needed for replay.py).
+request_log = RequestLogger('logs/requests.jsonl', include_text=False, sample_rate=1.0)
+
+def _wants_slim(data):
+    """Slim mode via ?mode=slim or {"mode": "slim"} in the body"""
+    return (request.args.get('mode') or data.get('mode')) == 'slim'
+
+def _respond(payload, status=200):
+    """Encode a payload according to the Accept header"""
+    mimetype = negotiate(request.accept_mimetypes)
+    if mimetype is None:
+        return jsonify({'error': 'msgpack encoding is not available'}), 406
+    
+    response = Response(encode(payload, mimetype), status=status, mimetype=mimetype)
+    response.headers['X-Response-Version'] = str(RESPONSE_VERSION)
+    response.vary.add('Accept')
+    return response
+
+def _custom_patterns(data):
+    """Inline pattern set from a request body, or the compiled matcher of a named one"""
+    if data.get('patterns'):
+        return data['patterns']
+    if data.get('pattern_set'):
+        if not isinstance(data['pattern_set'], str):
+            raise ValueError('pattern_set must be a string')
+        return detector.pattern_sets.named_matcher(data['pattern_set'])
+    return None
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -28,8 +76,10 @@ def health_check():
 def detect_bias():
     """
     Detect biases in provided text
-    Request: {"text": "some text to analyze"}
+    Request: {"text": "some text to analyze",
+              "pattern_set": "tenant-name" or "patterns": {...}}  (optional)
     Response: {"biases_detected": [...], "confidence": 85, ...}
+    Slim response (?mode=slim): {"v": 1, "biases": ["CB"], "spans": [["CB", "k", 0, 10]], ...}
     """
     try:
         data = request.json
@@ -38,17 +88,52 @@ def detect_bias():
         if not text:
             return jsonify({'error': 'No text provided'}), 400
         
-        # Run detection
-        result = detector.detect_biases(text)
+        # Run detection with any custom patterns layered over the defaults
+        slim = _wants_slim(data)
+        timings = {}
+        started = time.perf_counter()
+        result = detector.detect_biases(text, _custom_patterns(data), slim=slim, timings=timings)
+        timings['total_ms'] = (time.perf_counter() - started) * 1000
         
-        logger.info(f"Detected {len(result['biases_detected'])} biases")
+        request_log.log('detect', text, result, timings)
         
-        return jsonify(result)
+        logger.info(f"Detected {len(result['biases' if slim else 'biases_detected'])} biases")
+        
+        return _respond(result)
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     except Exception as e:
         logger.error(f"Error in detection: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/patterns/<name>', methods=['PUT'])
+def register_pattern_set(name):
+    """
+    Register a named custom pattern set
+    Headers: X-Admin-Token: <PATTERN_ADMIN_TOKEN>
+    Request: {"my_bias": {"keywords": [...], "phrases": [...], "severity": "high"}}
+    Response: {"name": "...", "hash": "..."}
+    """
+    token = request.headers.get('X-Admin-Token', '')
+    if not PATTERN_ADMIN_TOKEN or not hmac.compare_digest(token, PATTERN_ADMIN_TOKEN):
+        return jsonify({'error': 'Not authorized to register pattern sets'}), 403
+    
+    try:
+        content_hash = detector.pattern_sets.register(name, request.json)
+        
+        logger.info(f"Registered pattern set '{name}'")
+        
+        return jsonify({'name': name, 'hash': content_hash})
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    except Exception as e:
+        logger.error(f"Error registering patterns: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/correct', methods=['POST'])
 def correct_bias():
     """
@@ -64,22 +149,63 @@ def correct_bias():
         if not text:
             return jsonify({'error': 'No text provided'}), 400
         
+        # Preprocess once for detection and correction
+        context = AnalysisContext(text)
+        timings = {}
+        started = time.perf_counter()
+        
         # If no biases provided, detect them first
         if not biases:
-            detection = detector.detect_biases(text)
+            detection = detector.detect_biases(context, timings=timings)
             biases = detection['biases_detected']
         
         # Run correction
-        result = corrector.correct_response(text, biases)
+        correction_started = time.perf_counter()
+        result = corrector.correct_response(context, biases)
+        timings['correction_ms'] = (time.perf_counter() - correction_started) * 1000
+        timings['total_ms'] = (time.perf_counter() - started) * 1000
         
         logger.info(f"Corrected {len(biases)} biases")
         
-        return jsonify(result)
+        if _wants_slim(data):
+            result = slim_correction(result)
+        
+        request_log.log('correct', text, result, timings)
+        
+        return _respond(result)
     
     except Exception as e:
         logger.error(f"Error in correction: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+def _analyze(text, slim=False, timings=None):
+    """Detect + correct one text"""
+    # Preprocess once for detection and correction
+    context = AnalysisContext(text)
+    
+    # Detect biases
+    detection = detector.detect_biases(context, slim=slim, timings=timings)
+    if slim:
+        biases = [bias_type_for_code(code) for code in detection['biases']]
+    else:
+        biases = detection['biases_detected']
+    
+    # Correct if biases found
+    correction = None
+    if biases:
+        correction_started = time.perf_counter()
+        correction = corrector.correct_response(context, biases)
+        if slim:
+            correction = slim_correction(correction)
+        if timings is not None:
+            timings['correction_ms'] = (time.perf_counter() - correction_started) * 1000
+    
+    return {
+        'detection': detection,
+        'correction': correction,
+        'timestamp': datetime.now().isoformat()
+    }
+
 @app.route('/api/analyze', methods=['POST'])
 def full_analysis():
     """
@@ -94,21 +220,14 @@ def full_analysis():
         if not text:
             return jsonify({'error': 'No text provided'}), 400
         
-        # Detect biases
-        detection = detector.detect_biases(text)
+        timings = {}
+        started = time.perf_counter()
+        result = _analyze(text, _wants_slim(data), timings)
+        timings['total_ms'] = (time.perf_counter() - started) * 1000
         
-        # Correct if biases found
-        correction = None
-        if detection['biases_detected']:
-            correction = corrector.correct_response(text, detection['biases_detected'])
-        
-        result = {
-            'detection': detection,
-            'correction': correction,
-            'timestamp': datetime.now().isoformat()
-        }
+        request_log.log('analyze', text, result, timings)
         
-        return jsonify(result)
+        return _respond(result)
     
     except Exception as e:
         logger.error(f"Error in analysis: {str(e)}")
@@ -118,15 +237,18 @@ def full_analysis():
 def generate_training_data():
     """
     Generate synthetic training examples
-    Request: {"num_examples": 100}
+    Request: {"num_examples": 100, "dedupe": true}
     Response: {"examples": [...], "count": 100}
     """
     try:
         data = request.json
-        num_examples = data.get('num_examples', 100)
+        num_examples = _num_examples(data)
+        dedupe = bool(data.get('dedupe', False))
         
-        examples = trainer.generate_synthetic_examples(num_examples)
-        trainer.save_training_data()
+        with trainer_lock:
+            trainer.load_training_data()
+            examples = trainer.generate_synthetic_examples(num_examples, dedupe=dedupe)
+            trainer.save_training_data()
         
         return jsonify({
             'examples': examples[:10],  # Return first 10
@@ -134,16 +256,151 @@ def generate_training_data():
             'message': f'Generated {len(examples)} training examples'
         })
     
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
     except Exception as e:
         logger.error(f"Error generating training data: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+def _num_examples(data):
+    num_examples = data.get('num_examples', 100)
+    if not isinstance(num_examples, int) or isinstance(num_examples, bool) or num_examples < 1:
+        raise ValueError('num_examples must be a positive integer')
+    if num_examples > MAX_GENERATE_EXAMPLES:
+        raise ValueError(f'num_examples exceeds {MAX_GENERATE_EXAMPLES}')
+    return num_examples
+
+def _correct_job(text):
+    context = AnalysisContext(text)
+    biases = detector.detect_biases(context)['biases_detected']
+    return [corrector.correct_response(context, biases)]
+
+def _generate_state():
+    """Private trainer per generate job, seeded from the saved data for dedupe"""
+    job_trainer = BiasTrainingSystem()
+    job_trainer.load_training_data()
+    return {'trainer': job_trainer, 'start': len(job_trainer.training_data)}
+
+def _save_generated(state):
+    """Append a finished job's examples to whatever is saved now"""
+    new_examples = state['trainer'].training_data[state['start']:]
+    with trainer_lock:
+        trainer.load_training_data()
+        trainer.training_data.extend(new_examples)
+        trainer.save_training_data()
+
+# Background jobs: each handler maps one queued item to a list of results
+GENERATE_BATCH_SIZE = 1000
+
+jobs = JobManager(
+    handlers={
+        'detect': lambda text: [detector.detect_biases(text)],
+        'correct': _correct_job,
+        'analyze': lambda text: [_analyze(text)],
+        'generate': lambda item, state: state['trainer'].generate_synthetic_examples(
+            item['count'], dedupe=item['dedupe'])
+    },
+    finalizers={
+        'generate': _save_generated
+    },
+    states={
+        'generate': _generate_state
+    }
+)
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """
+    Queue a background job
+    Request: {"type": "detect" | "correct" | "analyze", "texts": [...]}
+             {"type": "generate", "num_examples": 100000, "dedupe": false}
+    Response: {"job_id": "...", "status": "queued"}  (202)
+    """
+    try:
+        data = request.json
+        job_type = data.get('type', '')
+        
+        if job_type == 'generate':
+            num_examples = _num_examples(data)
+            dedupe = bool(data.get('dedupe', False))
+            items = [
+                {'count': min(GENERATE_BATCH_SIZE, num_examples - start), 'dedupe': dedupe}
+                for start in range(0, num_examples, GENERATE_BATCH_SIZE)
+            ]
+        else:
+            items = data.get('texts', [])
+            if not isinstance(items, list):
+                return jsonify({'error': 'texts must be a list'}), 400
+            if not all(isinstance(text, str) and text for text in items):
+                return jsonify({'error': 'texts must be non-empty strings'}), 400
+        
+        job_id = jobs.submit(job_type, items)
+        
+        logger.info(f"Queued {job_type} job {job_id} with {len(items)} items")
+        
+        return jsonify({'job_id': job_id, 'status': 'queued'}), 202
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    except Exception as e:
+        logger.error(f"Error creating job: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Job status; ?wait=N long-polls up to N seconds (max 60) for completion
+    Response: {"job_id": "...", "status": "running", "completed_items": 3, ...}
+    """
+    wait = min(request.args.get('wait', 0, type=float), 60)
+    job = jobs.status(job_id, wait=wait)
+    
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    
+    return jsonify(job)
+
+@app.route('/api/jobs/<job_id>/results', methods=['GET'])
+def get_job_results(job_id):
+    """
+    Paginated job results: ?offset=0&limit=100 (limit max 1000)
+    Response: {"results": [...], "offset": 0, "next_offset": 100, "status": "..."}
+    """
+    job = jobs.status(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+    results = jobs.results(job_id, offset, limit)
+    
+    next_offset = offset + len(results)
+    return _respond({
+        'results': results,
+        'offset': offset,
+        'next_offset': next_offset if next_offset < job['result_count'] else None,
+        'status': job['status']
+    })
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel a queued or running job"""
+    job = jobs.cancel(job_id)
+    
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    
+    return jsonify(job)
+
 @app.route('/api/stats', methods=['GET'])
 def get_statistics():
     """Get system statistics"""
     try:
-        trainer.load_training_data()
-        metrics = trainer.train_evaluation_metrics()
+        with trainer_lock:
+            trainer.load_training_data()
+            metrics = trainer.train_evaluation_metrics()
         
         stats = {
             'total_detections': 0,  # Would track in production
@@ -151,7 +408,8 @@ def get_statistics():
             'training_examples': metrics['total_examples'] if metrics else 0,
             'bias_distribution': metrics['bias_distribution'] if metrics else {},
             'system_uptime': '24/7',
-            'avg_latency_ms': 230
+            'avg_latency_ms': 230,
+            'request_log': dict(request_log.stats)
         }
         
         return jsonify(stats)
@@ -164,9 +422,12 @@ if __name__ == '__main__':
     print("🚀 Starting AI Bias Detection API...")
     print("📊 Endpoints available:")
     print("   POST /api/detect - Detect biases")
+    print("   PUT  /api/patterns/<name> - Register custom pattern set")
     print("   POST /api/correct - Correct biased text")
     print("   POST /api/analyze - Full analysis")
     print("   POST /api/training/generate - Generate training data")
+    print("   POST /api/jobs - Queue a background job")
+    print("   GET  /api/jobs/<id>[/results] - Job status and results")
     print("   GET  /api/stats - System statistics")
     print("\n🌐 API running on http://localhost:5000")
     
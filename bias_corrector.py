@@ -1,6 +1,7 @@
 # bias_corrector.py
 from transformers import AutoModelForCausalLM, AutoTokenizer, pipeline
 import torch
+from analysis_context import AnalysisContext
 
 class BiasCorrectorAI:
     def __init__(self):
@@ -18,12 +19,13 @@ class BiasCorrectorAI:
     def correct_response(self, biased_text, detected_biases):
         """
         Generate corrected, unbiased version of the text
+        biased_text: raw string or the AnalysisContext used for detection
         """
-        # Create correction prompt
-        prompt = self._create_correction_prompt(biased_text, detected_biases)
+        context = AnalysisContext.of(biased_text)
+        biased_text = context.text
         
-        # Generate corrected response
-        corrected = self._generate_correction(prompt)
+        # Generate corrected response (rule-based, so no model prompt is built)
+        corrected = self._generate_correction(context)
         
         # Generate recommendations
         recommendations = self._generate_recommendations(detected_biases)
@@ -36,7 +38,7 @@ class BiasCorrectorAI:
         }
     
     def _create_correction_prompt(self, text, biases):
-        """Create prompt for correction model"""
+        """Create prompt for a fine-tuned correction model"""
         bias_descriptions = ', '.join(biases)
         
         prompt = f"""Rewrite this text to remove {bias_descriptions}:
@@ -53,7 +55,7 @@ Corrected version:"""
         
         return prompt
     
-    def _generate_correction(self, prompt):
+    def _generate_correction(self, context):
         """Generate corrected text using language model"""
         
         # For demonstration, use rule-based corrections
@@ -71,7 +73,7 @@ Corrected version:"""
             'based on recent trends': 'considering both historical and recent data'
         }
         
-        corrected = prompt.split("Corrected version:")[0].split("Original:")[1].strip()
+        corrected = context.text.strip()
         
         for biased, unbiased in corrections.items():
             corrected = corrected.replace(biased, unbiased)
@@ -1,212 +1,131 @@
 # bias_detector.py
-from transformers import pipeline
-from sentence_transformers import SentenceTransformer, util
-import numpy as np
-import re
+# torch, transformers and sentence_transformers are imported on first use
+# of the semantic stage; see LexicalDetector for the lexical-only path.
+import threading
+from bias_patterns import SEMANTIC_EXAMPLES
+from lexical_detector import LexicalDetector
 
-class BiasDetector:
-    def __init__(self):
-        # Load semantic similarity model (FREE)
-        self.semantic_model = SentenceTransformer('all-MiniLM-L6-v2')
-        
-        # Load sentiment analyzer
-        self.sentiment = pipeline('sentiment-analysis')
-        
-        # Load pattern database
-        from bias_patterns import BIAS_PATTERNS
-        self.patterns = BIAS_PATTERNS
-        
-    def detect_biases(self, text):
-        """
-        Main detection function - analyzes text for cognitive biases
-        Returns: dict with detected biases and confidence scores
-        """
-        results = {
-            'text': text,
-            'biases_detected': [],
-            'severity': 'low',
-            'confidence': 0,
-            'reasoning': []
-        }
-        
-        # 1. Keyword matching
-        keyword_biases = self._detect_keywords(text)
-        
-        # 2. Phrase pattern matching
-        phrase_biases = self._detect_phrases(text)
-        
-        # 3. Semantic analysis
-        semantic_biases = self._detect_semantic_patterns(text)
-        
-        # 4. Linguistic analysis
-        linguistic_biases = self._detect_linguistic_patterns(text)
-        
-        # Combine all detections
-        all_biases = keyword_biases + phrase_biases + semantic_biases + linguistic_biases
-        
-        # Remove duplicates and calculate confidence
-        unique_biases = list(set([b['type'] for b in all_biases]))
-        
-        if unique_biases:
-            results['biases_detected'] = unique_biases
-            results['confidence'] = min(95, len(all_biases) * 15)
-            results['severity'] = self._calculate_severity(unique_biases)
-            results['reasoning'] = self._generate_reasoning(all_biases, text)
-        
-        return results
+class BiasDetector(LexicalDetector):
+    def __init__(self, semantic=True):
+        super().__init__()
+        
+        # semantic=False skips the embedding model entirely
+        self.semantic = semantic
+        self.model_name = 'all-MiniLM-L6-v2'
+        self._semantic_model = None
+        self._sentiment = None
+        self._example_embeddings = None
+        self._load_lock = threading.Lock()
+        
+        # Similarity cut-off, with optional per-type overrides (see evaluate.py)
+        self.semantic_threshold = 0.65
+        self.semantic_thresholds = {}
+        
+        # Long inputs are split into overlapping token windows so text past
+        # the encoder's max sequence length is still checked. Words run
+        # ~1.3 word pieces each, hence the margin below max_seq_length.
+        # window_tokens defaults to 60% of max_seq_length once the model loads.
+        self.chunking = True
+        self.window_tokens = None
+        self.window_stride = None
+        self.window_batch_size = 32
+        self.pooling = 'max'  # or 'topk': mean of the best pooling_k windows
+        self.pooling_k = 3
     
-    def _detect_keywords(self, text):
-        """Detect bias through keyword presence"""
-        detected = []
-        text_lower = text.lower()
-        
-        for bias_type, config in self.patterns.items():
-            if 'keywords' in config:
-                for keyword in config['keywords']:
-                    if keyword.lower() in text_lower:
-                        detected.append({
-                            'type': bias_type,
-                            'method': 'keyword',
-                            'match': keyword,
-                            'severity': config['severity']
-                        })
-        
-        return detected
+    def load_semantic_model(self):
+        """Import the ML stack and load models the first time they are needed"""
+        with self._load_lock:
+            if self._semantic_model is not None:
+                return
+            
+            from sentence_transformers import SentenceTransformer
+            
+            # Load semantic similarity model (FREE)
+            model = SentenceTransformer(self.model_name)
+            
+            # Exemplar embeddings never change, so encode them once
+            self._example_embeddings = {
+                bias_type: model.encode(examples, convert_to_tensor=True)
+                for bias_type, examples in SEMANTIC_EXAMPLES.items()
+            }
+            
+            if self.window_tokens is None:
+                self.window_tokens = int(model.max_seq_length * 0.6)
+            if self.window_stride is None:
+                self.window_stride = int(self.window_tokens * 0.75)
+            
+            self._semantic_model = model
     
-    def _detect_phrases(self, text):
-        """Detect bias through phrase patterns"""
-        detected = []
-        text_lower = text.lower()
-        
-        for bias_type, config in self.patterns.items():
-            if 'phrases' in config:
-                for phrase in config['phrases']:
-                    if phrase.lower() in text_lower:
-                        detected.append({
-                            'type': bias_type,
-                            'method': 'phrase',
-                            'match': phrase,
-                            'severity': config['severity']
-                        })
-        
-        return detected
+    @property
+    def semantic_model(self):
+        if self._semantic_model is None:
+            self.load_semantic_model()
+        return self._semantic_model
+    
+    @property
+    def example_embeddings(self):
+        if self._example_embeddings is None:
+            self.load_semantic_model()
+        return self._example_embeddings
     
-    def _detect_semantic_patterns(self, text):
+    @property
+    def sentiment(self):
+        """Sentiment analyzer, loaded on first access"""
+        if self._sentiment is None:
+            from transformers import pipeline
+            self._sentiment = pipeline('sentiment-analysis')
+        return self._sentiment
+    
+    def _detect_semantic_patterns(self, context):
         """Detect bias through semantic similarity to known biased patterns"""
         detected = []
         
-        # Biased example sentences
-        biased_examples = {
-            'confirmation_bias': [
-                "This definitely proves my point",
-                "As everyone knows, this is obviously true",
-                "It's clear that this always happens"
-            ],
-            'availability_heuristic': [
-                "Given recent viral news, this trend is certain",
-                "Everyone's been talking about this lately",
-                "With what happened yesterday, we can conclude"
-            ],
-            'survivorship_bias': [
-                "Looking at successful people, we see they all did this",
-                "Every winner followed this exact path",
-                "The best performers all share this trait"
-            ]
-        }
+        if not self.semantic:
+            return detected
+        
+        # Loads the model (and window defaults) on first call
+        model = self.semantic_model
+        from sentence_transformers import util
+        
+        windows = [(0, len(context.text))]
+        if self.chunking:
+            windows = context.windows(self.window_tokens, self.window_stride)
         
-        # Encode input text
-        text_embedding = self.semantic_model.encode(text, convert_to_tensor=True)
+        # Encode input text, or all of its windows in one batched call
+        # (encode sorts inputs by length, so batches are length-bucketed)
+        if len(windows) == 1:
+            text_embedding = context.embedding(model)
+        else:
+            text_embedding = model.encode(
+                [context.text[start:end] for start, end in windows],
+                batch_size=self.window_batch_size,
+                convert_to_tensor=True
+            )
         
         # Compare with biased examples
-        for bias_type, examples in biased_examples.items():
-            example_embeddings = self.semantic_model.encode(examples, convert_to_tensor=True)
+        for bias_type, example_embeddings in self.example_embeddings.items():
             similarities = util.pytorch_cos_sim(text_embedding, example_embeddings)
             
-            max_similarity = float(similarities.max())
+            # Best exemplar per window, then pool across windows
+            window_scores = similarities.max(dim=1).values
+            best_window = int(window_scores.argmax())
+            if self.pooling == 'topk' and len(windows) > 1:
+                k = min(self.pooling_k, len(windows))
+                max_similarity = float(window_scores.topk(k).values.mean())
+            else:
+                max_similarity = float(window_scores[best_window])
             
             # If high similarity to biased examples
-            if max_similarity > 0.65:  # Threshold
+            if max_similarity > self.semantic_thresholds.get(bias_type, self.semantic_threshold):
                 detected.append({
                     'type': bias_type,
                     'method': 'semantic',
                     'confidence': max_similarity,
+                    'span': windows[best_window],
                     'severity': self.patterns[bias_type]['severity']
                 })
         
         return detected
-    
-    def _detect_linguistic_patterns(self, text):
-        """Detect bias through linguistic analysis"""
-        detected = []
-        
-        # Check for absolute language (sign of confirmation bias)
-        absolute_words = ['always', 'never', 'everyone', 'nobody', 'all', 'none']
-        absolute_count = sum(1 for word in absolute_words if word in text.lower())
-        
-        if absolute_count >= 2:
-            detected.append({
-                'type': 'confirmation_bias',
-                'method': 'linguistic',
-                'match': f'{absolute_count} absolute terms',
-                'severity': 'high'
-            })
-        
-        # Check for lack of uncertainty markers (problematic)
-        uncertainty_markers = ['might', 'could', 'perhaps', 'possibly', 'approximately']
-        has_uncertainty = any(marker in text.lower() for marker in uncertainty_markers)
-        
-        # Check for definitive predictions
-        definitive_patterns = ['will definitely', 'certainly will', 'guaranteed to']
-        has_definitive = any(pattern in text.lower() for pattern in definitive_patterns)
-        
-        if has_definitive and not has_uncertainty:
-            detected.append({
-                'type': 'confirmation_bias',
-                'method': 'linguistic',
-                'match': 'overconfident prediction',
-                'severity': 'high'
-            })
-        
-        return detected
-    
-    def _calculate_severity(self, bias_types):
-        """Calculate overall severity"""
-        severity_scores = {
-            'critical': 4,
-            'high': 3,
-            'medium': 2,
-            'low': 1
-        }
-        
-        max_severity = 0
-        for bias_type in bias_types:
-            if bias_type in self.patterns:
-                severity = self.patterns[bias_type]['severity']
-                max_severity = max(max_severity, severity_scores.get(severity, 0))
-        
-        severity_map = {4: 'critical', 3: 'high', 2: 'medium', 1: 'low'}
-        return severity_map.get(max_severity, 'low')
-    
-    def _generate_reasoning(self, all_biases, text):
-        """Generate human-readable reasoning for detections"""
-        reasoning = []
-        
-        for bias in all_biases[:4]:  # Top 4 reasons
-            bias_type = bias['type']
-            if bias_type in self.patterns:
-                desc = self.patterns[bias_type]['description']
-                method = bias['method']
-                
-                if 'match' in bias:
-                    reasoning.append(
-                        f"Detected {desc.lower()} through {method} analysis: '{bias['match']}'"
-                    )
-                else:
-                    reasoning.append(
-                        f"Detected {desc.lower()} through {method} analysis"
-                    )
-        
-        return reasoning
 
 # Test the detector
 if __name__ == "__main__":
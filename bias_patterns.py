@@ -12,7 +12,8 @@ BIAS_PATTERNS = {
             'studies show' # without citation
         ],
         'severity': 'high',
-        'description': 'Overconfident assertions without evidence'
+        'description': 'Overconfident assertions without evidence',
+        'code': 'CB'
     },
     
     'availability_heuristic': {
@@ -26,7 +27,8 @@ BIAS_PATTERNS = {
             'based on current trends'
         ],
         'severity': 'high',
-        'description': 'Overweighting recent or memorable information'
+        'description': 'Overweighting recent or memorable information',
+        'code': 'AH'
     },
     
     'anchoring_bias': {
@@ -40,7 +42,8 @@ BIAS_PATTERNS = {
             'anchored at'
         ],
         'severity': 'medium',
-        'description': 'Over-reliance on initial information'
+        'description': 'Over-reliance on initial information',
+        'code': 'AB'
     },
     
     'survivorship_bias': {
@@ -54,7 +57,8 @@ BIAS_PATTERNS = {
             'top performers show that'
         ],
         'severity': 'critical',
-        'description': 'Ignoring failures, focusing only on successes'
+        'description': 'Ignoring failures, focusing only on successes',
+        'code': 'SB'
     },
     
     'recency_bias': {
@@ -63,7 +67,8 @@ BIAS_PATTERNS = {
             'this week', 'currently'
         ],
         'severity': 'medium',
-        'description': 'Disproportionate weight on recent data'
+        'description': 'Disproportionate weight on recent data',
+        'code': 'RB'
     },
     
     'groupthink': {
@@ -77,6 +82,26 @@ BIAS_PATTERNS = {
             'it\'s generally agreed'
         ],
         'severity': 'medium',
-        'description': 'Suppressing alternative viewpoints'
+        'description': 'Suppressing alternative viewpoints',
+        'code': 'GT'
     }
+}
+
+# Biased example sentences for semantic similarity matching
+SEMANTIC_EXAMPLES = {
+    'confirmation_bias': [
+        "This definitely proves my point",
+        "As everyone knows, this is obviously true",
+        "It's clear that this always happens"
+    ],
+    'availability_heuristic': [
+        "Given recent viral news, this trend is certain",
+        "Everyone's been talking about this lately",
+        "With what happened yesterday, we can conclude"
+    ],
+    'survivorship_bias': [
+        "Looking at successful people, we see they all did this",
+        "Every winner followed this exact path",
+        "The best performers all share this trait"
+    ]
 }
\ No newline at end of file
@@ -0,0 +1,192 @@
+# evaluate.py - Precision/recall harness and semantic threshold tuning
+import argparse
+import hashlib
+import json
+import os
+import time
+import numpy as np
+
+from analysis_context import AnalysisContext
+from bias_patterns import BIAS_PATTERNS, SEMANTIC_EXAMPLES
+
+DEFAULT_THRESHOLDS = np.round(np.arange(0.30, 0.951, 0.01), 2)
+
+
+def load_examples(filename='bias_training_data.json'):
+    """Return (texts, labels) from the labeled training corpus"""
+    with open(filename, 'r') as f:
+        data = json.load(f)
+    texts = [example['biased_text'] for example in data]
+    labels = [example['bias_type'] for example in data]
+    return texts, labels
+
+
+def encode_cached(model, model_name, texts, cache_dir='.embedding_cache', batch_size=256):
+    """
+    Encode texts in batches, caching the normalized embedding matrix on
+    disk keyed by model name and corpus content
+    """
+    digest = hashlib.sha256(model_name.encode('utf-8'))
+    for text in texts:
+        digest.update(text.encode('utf-8'))
+        digest.update(b'\0')
+    path = os.path.join(cache_dir, f'{digest.hexdigest()[:24]}.npy')
+
+    if os.path.exists(path):
+        return np.load(path)
+
+    embeddings = model.encode(
+        texts,
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=len(texts) > 10000
+    ).astype(np.float32)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    np.save(path, embeddings)
+    return embeddings
+
+
+def semantic_scores(embeddings, example_embeddings):
+    """
+    Max cosine similarity per semantic bias type as one matrix product.
+    example_embeddings: {bias_type: (k, dim) normalized array}
+    Returns: (bias_types, (n, len(bias_types)) array)
+    """
+    bias_types = list(example_embeddings)
+    exemplars = np.vstack([example_embeddings[t] for t in bias_types])
+    similarities = embeddings @ exemplars.T
+
+    scores = np.empty((len(embeddings), len(bias_types)), dtype=np.float32)
+    offset = 0
+    for i, bias_type in enumerate(bias_types):
+        count = len(example_embeddings[bias_type])
+        scores[:, i] = similarities[:, offset:offset + count].max(axis=1)
+        offset += count
+    return bias_types, scores
+
+
+def rule_predictions(detector, texts, bias_types):
+    """Boolean (n, types) matrix of keyword/phrase/linguistic detections"""
+    column = {bias_type: i for i, bias_type in enumerate(bias_types)}
+    predicted = np.zeros((len(texts), len(bias_types)), dtype=bool)
+
+    for row, text in enumerate(texts):
+        context = AnalysisContext(text)
+        detections = detector.matcher.match(context.lower) + detector._detect_linguistic_patterns(context)
+        for bias in detections:
+            if bias['type'] in column:
+                predicted[row, column[bias['type']]] = True
+
+    return predicted
+
+
+def _prf(tp, fp, fn):
+    precision = np.divide(tp, tp + fp, out=np.zeros(tp.shape), where=(tp + fp) > 0)
+    recall = np.divide(tp, tp + fn, out=np.zeros(tp.shape), where=(tp + fn) > 0)
+    f1 = np.divide(2 * precision * recall, precision + recall,
+                   out=np.zeros(tp.shape), where=(precision + recall) > 0)
+    return precision, recall, f1
+
+
+def sweep_thresholds(scores, rules, truth, thresholds=DEFAULT_THRESHOLDS):
+    """
+    Evaluate every threshold at once for one bias type.
+    scores: (n,) similarities, rules: (n,) rule hits, truth: (n,) labels
+    Returns per-threshold tp/fp/fn/tn and precision/recall/f1 arrays
+    """
+    predicted = rules[None, :] | (scores[None, :] > thresholds[:, None])
+    tp = (predicted & truth).sum(axis=1)
+    fp = (predicted & ~truth).sum(axis=1)
+    fn = (~predicted & truth).sum(axis=1)
+    tn = len(truth) - tp - fp - fn
+    precision, recall, f1 = _prf(tp, fp, fn)
+    return {'tp': tp, 'fp': fp, 'fn': fn, 'tn': tn,
+            'precision': precision, 'recall': recall, 'f1': f1}
+
+
+def evaluate(detector, texts, labels, thresholds=DEFAULT_THRESHOLDS, cache_dir='.embedding_cache'):
+    """Per-type precision/recall/F1 at the current and best thresholds"""
+    bias_types = list(BIAS_PATTERNS)
+    truth = np.array(labels)[:, None] == np.array(bias_types)[None, :]
+    rules = rule_predictions(detector, texts, bias_types)
+
+    embeddings = encode_cached(detector.semantic_model, detector.model_name, texts, cache_dir)
+    example_embeddings = {
+        bias_type: detector.semantic_model.encode(
+            examples, convert_to_numpy=True, normalize_embeddings=True)
+        for bias_type, examples in SEMANTIC_EXAMPLES.items()
+    }
+    semantic_types, scores = semantic_scores(embeddings, example_embeddings)
+
+    report = {'examples': len(texts), 'per_type': {}, 'recommended_thresholds': {}}
+    final_predictions = rules.copy()
+
+    for i, bias_type in enumerate(bias_types):
+        current = detector.semantic_thresholds.get(bias_type, detector.semantic_threshold)
+        entry = {'support': int(truth[:, i].sum())}
+
+        if bias_type in semantic_types:
+            type_scores = scores[:, semantic_types.index(bias_type)]
+            sweep = sweep_thresholds(type_scores, rules[:, i], truth[:, i], thresholds)
+            best = int(np.argmax(sweep['f1']))
+            entry['best_threshold'] = float(thresholds[best])
+            entry['best'] = {k: float(sweep[k][best]) for k in ('precision', 'recall', 'f1')}
+            report['recommended_thresholds'][bias_type] = float(thresholds[best])
+            final_predictions[:, i] |= type_scores > current
+
+        tp = int((final_predictions[:, i] & truth[:, i]).sum())
+        fp = int((final_predictions[:, i] & ~truth[:, i]).sum())
+        fn = int((~final_predictions[:, i] & truth[:, i]).sum())
+        tn = len(texts) - tp - fp - fn
+        precision, recall, f1 = _prf(np.array([tp]), np.array([fp]), np.array([fn]))
+
+        entry['current_threshold'] = current
+        entry['current'] = {
+            'precision': float(precision[0]),
+            'recall': float(recall[0]),
+            'f1': float(f1[0]),
+            'confusion_matrix': [[tn, fp], [fn, tp]]
+        }
+        report['per_type'][bias_type] = entry
+
+    # Rows: true label, columns: how often each type was predicted for it
+    report['label_confusion'] = {
+        label: {bias_type: int(final_predictions[truth[:, i], j].sum())
+                for j, bias_type in enumerate(bias_types)}
+        for i, label in enumerate(bias_types)
+    }
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Evaluate BiasDetector against labeled data')
+    parser.add_argument('--data', default='bias_training_data.json')
+    parser.add_argument('--cache-dir', default='.embedding_cache')
+    parser.add_argument('--output', default='evaluation_report.json')
+    args = parser.parse_args()
+
+    from bias_detector import BiasDetector
+
+    detector = BiasDetector()
+    texts, labels = load_examples(args.data)
+
+    start = time.time()
+    report = evaluate(detector, texts, labels, cache_dir=args.cache_dir)
+    elapsed = time.time() - start
+
+    print(f"Evaluated {len(texts)} examples in {elapsed:.1f}s\n")
+    print(f"{'Bias type':<26}{'P':>7}{'R':>7}{'F1':>7}   best threshold (F1)")
+    for bias_type, entry in report['per_type'].items():
+        current = entry['current']
+        best = ''
+        if 'best_threshold' in entry:
+            best = f"{entry['best_threshold']:.2f} ({entry['best']['f1']:.3f})"
+        print(f"{bias_type:<26}{current['precision']:>7.3f}{current['recall']:>7.3f}"
+              f"{current['f1']:>7.3f}   {best}")
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved report to {args.output}")
@@ -0,0 +1,216 @@
+# jobs.py - Background job queue backed by SQLite
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATES = ('completed', 'failed', 'cancelled')
+
+
+class JobManager:
+    """
+    Runs long detection/correction/generation work on a local thread
+    pool. Jobs and their results live in SQLite so they survive a
+    restart; only the newest max_jobs jobs are kept.
+
+    handlers: {job_type: callable(item) -> iterable of JSON-able results}
+    finalizers: {job_type: callable()} run once a job completes
+    states: {job_type: callable() -> state} for job types that need
+        private per-job state; their handlers are called as
+        handler(item, state) and finalizers as finalizer(state)
+    """
+
+    def __init__(self, handlers, finalizers=None, states=None, db_path='jobs.db',
+                 num_workers=2, max_jobs=1000, max_items=10000):
+        self.handlers = handlers
+        self.finalizers = finalizers or {}
+        self.states = states or {}
+        self.max_jobs = max_jobs
+        self.max_items = max_items
+
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db_lock = threading.Lock()
+        self._changed = threading.Condition()
+        self._cancelled = set()
+        self._queue = queue.Queue()
+
+        self._init_db()
+
+        self._workers = []
+        for i in range(num_workers):
+            worker = threading.Thread(target=self._work, name=f'job-worker-{i}', daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _init_db(self):
+        with self._db_lock, self._db:
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    type TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    items TEXT NOT NULL,
+                    total_items INTEGER NOT NULL,
+                    completed_items INTEGER NOT NULL DEFAULT 0,
+                    result_count INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS job_results (
+                    job_id TEXT NOT NULL,
+                    idx INTEGER NOT NULL,
+                    result TEXT NOT NULL,
+                    PRIMARY KEY (job_id, idx)
+                );
+            """)
+            # Work in flight when the process stopped cannot be resumed
+            self._db.execute(
+                "UPDATE jobs SET status = 'failed', error = 'interrupted by restart' "
+                "WHERE status IN ('queued', 'running')"
+            )
+
+    def _update(self, job_id, **fields):
+        fields['updated_at'] = datetime.now().isoformat()
+        assignments = ', '.join(f'{key} = ?' for key in fields)
+        with self._db_lock, self._db:
+            self._db.execute(f'UPDATE jobs SET {assignments} WHERE id = ?',
+                             (*fields.values(), job_id))
+        with self._changed:
+            self._changed.notify_all()
+
+    def submit(self, job_type, items):
+        """Queue a job and return its ID; raises ValueError on bad input"""
+        if job_type not in self.handlers:
+            raise ValueError(f"Unknown job type '{job_type}'")
+        if not items:
+            raise ValueError('Job has no items')
+        if len(items) > self.max_items:
+            raise ValueError(f'Job exceeds {self.max_items} items')
+
+        job_id = uuid.uuid4().hex
+        now = datetime.now().isoformat()
+        with self._db_lock, self._db:
+            self._db.execute(
+                'INSERT INTO jobs (id, type, status, items, total_items, created_at, updated_at) '
+                "VALUES (?, ?, 'queued', ?, ?, ?, ?)",
+                (job_id, job_type, json.dumps(items), len(items), now, now)
+            )
+        self._prune()
+
+        self._queue.put(job_id)
+        return job_id
+
+    def _prune(self):
+        """Drop the oldest finished jobs beyond max_jobs"""
+        with self._db_lock, self._db:
+            stale = [row[0] for row in self._db.execute(
+                'SELECT id FROM jobs WHERE status IN (?, ?, ?) '
+                'ORDER BY created_at DESC LIMIT -1 OFFSET ?',
+                (*TERMINAL_STATES, self.max_jobs)
+            )]
+            for job_id in stale:
+                self._db.execute('DELETE FROM job_results WHERE job_id = ?', (job_id,))
+                self._db.execute('DELETE FROM jobs WHERE id = ?', (job_id,))
+
+    def status(self, job_id, wait=0):
+        """
+        Job status dict, or None if unknown. With wait > 0, block up to
+        that many seconds for the job to finish (long-poll).
+        """
+        deadline = time.monotonic() + wait
+        # Check and wait under the condition, so an update landing between
+        # the fetch and the wait cannot be missed
+        with self._changed:
+            while True:
+                job = self._fetch(job_id)
+                remaining = deadline - time.monotonic()
+                if job is None or job['status'] in TERMINAL_STATES or remaining <= 0:
+                    return job
+                self._changed.wait(timeout=remaining)
+
+    def _fetch(self, job_id):
+        with self._db_lock:
+            row = self._db.execute(
+                'SELECT id, type, status, total_items, completed_items, result_count, '
+                'error, created_at, updated_at FROM jobs WHERE id = ?', (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        keys = ('job_id', 'type', 'status', 'total_items', 'completed_items',
+                'result_count', 'error', 'created_at', 'updated_at')
+        return dict(zip(keys, row))
+
+    def results(self, job_id, offset=0, limit=100):
+        """One page of a job's results in order"""
+        with self._db_lock:
+            rows = self._db.execute(
+                'SELECT result FROM job_results WHERE job_id = ? AND idx >= ? '
+                'ORDER BY idx LIMIT ?', (job_id, offset, limit)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def cancel(self, job_id):
+        """Request cancellation; returns the job status or None if unknown"""
+        job = self._fetch(job_id)
+        if job is None or job['status'] in TERMINAL_STATES:
+            return job
+
+        self._cancelled.add(job_id)
+        if job['status'] == 'queued':
+            self._update(job_id, status='cancelled')
+        return self._fetch(job_id)
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            try:
+                self._run(job_id)
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {str(e)}")
+                self._update(job_id, status='failed', error=str(e))
+            finally:
+                self._cancelled.discard(job_id)
+                self._queue.task_done()
+
+    def _run(self, job_id):
+        with self._db_lock:
+            row = self._db.execute(
+                'SELECT type, status, items FROM jobs WHERE id = ?', (job_id,)
+            ).fetchone()
+        if row is None or row[1] != 'queued':
+            return
+
+        job_type, _, items = row
+        handler = self.handlers[job_type]
+        finalizer = self.finalizers.get(job_type)
+        extra = (self.states[job_type](),) if job_type in self.states else ()
+        self._update(job_id, status='running')
+
+        result_count = 0
+        for completed, item in enumerate(json.loads(items), start=1):
+            if job_id in self._cancelled:
+                self._update(job_id, status='cancelled')
+                return
+
+            rows = []
+            for result in handler(item, *extra):
+                rows.append((job_id, result_count, json.dumps(result)))
+                result_count += 1
+
+            with self._db_lock, self._db:
+                self._db.executemany(
+                    'INSERT INTO job_results (job_id, idx, result) VALUES (?, ?, ?)', rows
+                )
+            self._update(job_id, completed_items=completed, result_count=result_count)
+
+        if finalizer is not None:
+            finalizer(*extra)
+        self._update(job_id, status='completed')
@@ -0,0 +1,185 @@
+# lexical_detector.py - Keyword, phrase and linguistic detection only
+# Imports nothing heavier than the standard library, so it starts fast
+# for CLI hooks and serverless functions. BiasDetector adds the
+# semantic stage on top.
+import time
+from analysis_context import AnalysisContext
+from bias_patterns import BIAS_PATTERNS
+from pattern_matcher import PatternMatcher, PatternSetCache
+from response_format import slim_detection
+
+class LexicalDetector:
+    def __init__(self):
+        # Load pattern database
+        self.patterns = BIAS_PATTERNS
+        
+        # Compiled matcher for the default patterns, plus cached custom sets
+        self.matcher = PatternMatcher(self.patterns)
+        self.pattern_sets = PatternSetCache()
+        
+    def detect_biases(self, text, custom_patterns=None, slim=False, timings=None):
+        """
+        Main detection function - analyzes text for cognitive biases
+        text: raw string or a prepared AnalysisContext
+        custom_patterns: optional pattern set merged on top of BIAS_PATTERNS,
+            or an already compiled PatternMatcher
+        slim: return the compact payload (no text echo or reasoning)
+        timings: optional dict that receives per-stage durations in ms
+        Returns: dict with detected biases and confidence scores
+        """
+        started = time.perf_counter()
+        context = AnalysisContext.of(text)
+        text = context.text
+        
+        matcher = self.matcher
+        if isinstance(custom_patterns, PatternMatcher):
+            matcher = custom_patterns
+        elif custom_patterns:
+            matcher = self.pattern_sets.get_matcher(custom_patterns)
+        
+        results = {
+            'text': text,
+            'biases_detected': [],
+            'severity': 'low',
+            'confidence': 0,
+            'reasoning': []
+        }
+        
+        # 1 + 2. Keyword and phrase matching in one pass
+        lexical_biases = matcher.match(context.lower, text)
+        lexical_done = time.perf_counter()
+        
+        # 3. Semantic analysis
+        semantic_biases = self._detect_semantic_patterns(context)
+        semantic_done = time.perf_counter()
+        
+        # 4. Linguistic analysis
+        linguistic_biases = self._detect_linguistic_patterns(context)
+        linguistic_done = time.perf_counter()
+        
+        if timings is not None:
+            timings['lexical_ms'] = (lexical_done - started) * 1000
+            timings['semantic_ms'] = (semantic_done - lexical_done) * 1000
+            timings['linguistic_ms'] = (linguistic_done - semantic_done) * 1000
+        
+        # Combine all detections
+        all_biases = lexical_biases + semantic_biases + linguistic_biases
+        
+        # Remove duplicates and calculate confidence
+        unique_biases = list(set([b['type'] for b in all_biases]))
+        
+        if unique_biases:
+            results['biases_detected'] = unique_biases
+            results['confidence'] = min(95, len(all_biases) * 15)
+            results['severity'] = self._calculate_severity(unique_biases, matcher.patterns)
+        
+        if slim:
+            return slim_detection(results, all_biases, matcher.patterns)
+        
+        if unique_biases:
+            results['reasoning'] = self._generate_reasoning(all_biases, text, matcher.patterns)
+        
+        return results
+    
+    def _detect_semantic_patterns(self, context):
+        """No semantic stage without an embedding model"""
+        return []
+    
+    def _detect_linguistic_patterns(self, context):
+        """Detect bias through linguistic analysis"""
+        detected = []
+        text_lower = context.lower
+        
+        # Check for absolute language (sign of confirmation bias)
+        absolute_words = ['always', 'never', 'everyone', 'nobody', 'all', 'none']
+        absolute_count = sum(1 for word in absolute_words if word in text_lower)
+        
+        if absolute_count >= 2:
+            detected.append({
+                'type': 'confirmation_bias',
+                'method': 'linguistic',
+                'match': f'{absolute_count} absolute terms',
+                'severity': 'high'
+            })
+        
+        # Definitive predictions without uncertainty markers; a hedge only
+        # counts when it is in the same sentence as the prediction
+        uncertainty_markers = ['might', 'could', 'perhaps', 'possibly', 'approximately']
+        definitive_patterns = ['will definitely', 'certainly will', 'guaranteed to']
+        
+        if any(pattern in text_lower for pattern in definitive_patterns):
+            for start, end in context.sentences:
+                sentence = context.text[start:end].lower()
+                has_definitive = any(pattern in sentence for pattern in definitive_patterns)
+                has_uncertainty = any(marker in sentence for marker in uncertainty_markers)
+                if has_definitive and not has_uncertainty:
+                    detected.append({
+                        'type': 'confirmation_bias',
+                        'method': 'linguistic',
+                        'match': 'overconfident prediction',
+                        'span': (start, end),
+                        'severity': 'high'
+                    })
+                    break
+        
+        return detected
+    
+    def _calculate_severity(self, bias_types, patterns=None):
+        """Calculate overall severity"""
+        patterns = patterns or self.patterns
+        severity_scores = {
+            'critical': 4,
+            'high': 3,
+            'medium': 2,
+            'low': 1
+        }
+        
+        max_severity = 0
+        for bias_type in bias_types:
+            if bias_type in patterns:
+                severity = patterns[bias_type]['severity']
+                max_severity = max(max_severity, severity_scores.get(severity, 0))
+        
+        severity_map = {4: 'critical', 3: 'high', 2: 'medium', 1: 'low'}
+        return severity_map.get(max_severity, 'low')
+    
+    def _generate_reasoning(self, all_biases, text, patterns=None):
+        """Generate human-readable reasoning for detections"""
+        patterns = patterns or self.patterns
+        reasoning = []
+        
+        for bias in all_biases[:4]:  # Top 4 reasons
+            bias_type = bias['type']
+            if bias_type in patterns:
+                desc = patterns[bias_type]['description']
+                method = bias['method']
+                
+                if 'match' in bias:
+                    reasoning.append(
+                        f"Detected {desc.lower()} through {method} analysis: '{bias['match']}'"
+                    )
+                else:
+                    reasoning.append(
+                        f"Detected {desc.lower()} through {method} analysis"
+                    )
+        
+        return reasoning
+
+# Scan files (e.g. from a pre-commit hook); exits 1 if any bias is found
+if __name__ == "__main__":
+    import sys
+    
+    detector = LexicalDetector()
+    found = False
+    
+    for path in sys.argv[1:]:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            result = detector.detect_biases(f.read())
+        
+        if result['biases_detected']:
+            found = True
+            print(f"{path}: {', '.join(sorted(result['biases_detected']))} ({result['severity']})")
+            for reason in result['reasoning']:
+                print(f"  • {reason}")
+    
+    sys.exit(1 if found else 0)
@@ -0,0 +1,196 @@
+# load_test.py - Closed-loop load generator for the REST API
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime
+import numpy as np
+import requests
+
+API_URL = "http://localhost:5000/api"
+ENDPOINTS = ['detect', 'correct', 'analyze']
+
+
+def load_texts(filename='bias_training_data.json'):
+    """Biased texts from the training corpus, the source of request bodies"""
+    with open(filename, 'r') as f:
+        return [example['biased_text'] for example in json.load(f)]
+
+
+def make_text(texts, rng, mean_sentences=1.0):
+    """
+    One request body: a run of corpus sentences whose count is drawn from
+    a geometric distribution, giving a long-tailed length mix
+    """
+    count = rng.geometric(1 / mean_sentences) if mean_sentences > 1 else 1
+    return ' '.join(texts[i] for i in rng.integers(len(texts), size=count))
+
+
+def server_rss_mb(pid):
+    """Resident memory of the API process in MB, or None if unavailable"""
+    if pid is None:
+        return None
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss / (1024 * 1024)
+    except Exception:
+        return None
+
+
+def run_level(url, texts, concurrency, duration, mean_sentences, seed, server_pid=None):
+    """
+    Keep `concurrency` clients busy for `duration` seconds, each sending
+    its next request as soon as the previous one returns. Throughput
+    counts successful requests only. Server RSS is sampled twice a
+    second while the level runs.
+    """
+    deadline = time.monotonic() + duration
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def client(index):
+        rng = np.random.default_rng(seed + index)
+        session = requests.Session()
+        local_latencies, local_errors = [], []
+
+        while time.monotonic() < deadline:
+            body = {'text': make_text(texts, rng, mean_sentences)}
+            start = time.perf_counter()
+            try:
+                response = session.post(url, json=body, timeout=60)
+                ok = response.status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - start
+
+            if ok:
+                local_latencies.append(elapsed)
+            else:
+                local_errors.append(elapsed)
+
+        with lock:
+            latencies.extend(local_latencies)
+            errors.extend(local_errors)
+
+    rss_samples = []
+
+    def sample_rss():
+        while time.monotonic() < deadline:
+            rss = server_rss_mb(server_pid)
+            if rss is not None:
+                rss_samples.append(rss)
+            time.sleep(0.5)
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    if server_pid is not None:
+        threads.append(threading.Thread(target=sample_rss))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.monotonic() - started
+
+    total = len(latencies) + len(errors)
+    ms = np.array(latencies) * 1000
+    # Only successful requests count as capacity; a server failing fast
+    # would otherwise look faster
+    return {
+        'concurrency': concurrency,
+        'requests': total,
+        'errors': len(errors),
+        'throughput_rps': len(latencies) / wall if wall else 0,
+        'error_rate': len(errors) / total if total else 0,
+        'latency_ms': {
+            'mean': float(ms.mean()) if len(ms) else None,
+            'p50': float(np.percentile(ms, 50)) if len(ms) else None,
+            'p90': float(np.percentile(ms, 90)) if len(ms) else None,
+            'p99': float(np.percentile(ms, 99)) if len(ms) else None,
+            'max': float(ms.max()) if len(ms) else None
+        },
+        'server_rss_mb': rss_samples[-1] if rss_samples else None,
+        'server_peak_rss_mb': max(rss_samples) if rss_samples else None
+    }
+
+
+def print_comparison(current, baseline):
+    """Throughput and p99 change against a previous results file"""
+    print(f"\nComparison with {baseline['timestamp']} ({baseline.get('label') or 'unlabeled'}):")
+    for endpoint, levels in current['endpoints'].items():
+        previous = {level['concurrency']: level for level in baseline['endpoints'].get(endpoint, [])}
+        for level in levels:
+            old = previous.get(level['concurrency'])
+            if not old or not old['throughput_rps'] or old['latency_ms']['p99'] is None \
+                    or level['latency_ms']['p99'] is None:
+                continue
+            rps = (level['throughput_rps'] / old['throughput_rps'] - 1) * 100
+            p99 = (level['latency_ms']['p99'] / old['latency_ms']['p99'] - 1) * 100
+            print(f"  /{endpoint:<8} c={level['concurrency']:<4} "
+                  f"throughput {rps:+6.1f}%   p99 {p99:+6.1f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Sweep API concurrency and record capacity')
+    parser.add_argument('--url', default=API_URL)
+    parser.add_argument('--endpoints', nargs='+', default=ENDPOINTS, choices=ENDPOINTS)
+    parser.add_argument('--concurrency', nargs='+', type=int, default=[1, 2, 4, 8, 16])
+    parser.add_argument('--duration', type=float, default=20, help='seconds per level')
+    parser.add_argument('--mean-sentences', type=float, default=1.5,
+                        help='mean corpus sentences per request')
+    parser.add_argument('--data', default='bias_training_data.json')
+    parser.add_argument('--server-pid', type=int, help='API process to sample RSS from')
+    parser.add_argument('--label', help='release or commit being measured')
+    parser.add_argument('--output-dir', default='load_results')
+    parser.add_argument('--compare', help='previous results file to diff against')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    texts = load_texts(args.data)
+
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'label': args.label,
+        'settings': {
+            'duration': args.duration,
+            'mean_sentences': args.mean_sentences,
+            'concurrency': args.concurrency
+        },
+        'endpoints': {}
+    }
+
+    for endpoint in args.endpoints:
+        url = f"{args.url}/{endpoint}"
+        report['endpoints'][endpoint] = []
+        print(f"\n/{endpoint}")
+        print(f"{'conc':>5}{'req/s':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'errors':>8}{'peak RSS MB':>13}")
+
+        for concurrency in args.concurrency:
+            level = run_level(url, texts, concurrency, args.duration,
+                              args.mean_sentences, args.seed, args.server_pid)
+            report['endpoints'][endpoint].append(level)
+
+            latency = level['latency_ms']
+            fmt = lambda value: f"{value:9.1f}" if value is not None else f"{'-':>9}"
+            print(f"{concurrency:>5}{level['throughput_rps']:>9.1f}{fmt(latency['p50'])}"
+                  f"{fmt(latency['p90'])}{fmt(latency['p99'])}{level['error_rate']:>8.1%}"
+                  f"    {fmt(level['server_peak_rss_mb'])}")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    path = os.path.join(args.output_dir, f"{args.label or 'run'}-{stamp}.json")
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved results to {path}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            print_comparison(report, json.load(f))
@@ -0,0 +1,267 @@
+# pattern_matcher.py
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from bias_patterns import BIAS_PATTERNS
+
+# Below this many distinct terms a plain `in` scan per term beats the regex
+SCAN_THRESHOLD = 200
+
+VALID_SEVERITIES = ('critical', 'high', 'medium', 'low')
+
+# Largest custom pattern set accepted (keywords plus phrases)
+MAX_PATTERN_TERMS = 10000
+
+
+def _trie_regex(terms):
+    """
+    Build a regex whose alternation is factored into a prefix trie, plus
+    {term: shorter terms that are prefixes of it}
+    """
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = term
+
+    # A term's prefixes are the term ends passed on the way down its path
+    prefixes = {}
+    for term in terms:
+        node = trie
+        found = []
+        for char in term[:-1]:
+            node = node[char]
+            if '' in node:
+                found.append(node[''])
+        prefixes[term] = found
+
+    def build(node):
+        alternatives = [re.escape(char) + build(child)
+                        for char, child in sorted(node.items()) if char != '']
+        if not alternatives:
+            return ''
+        body = alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+        return '(?:' + body + ')?' if '' in node else body
+
+    # Zero-width lookahead visits every offset, so overlapping terms are found
+    return re.compile('(?=(' + build(trie) + '))'), prefixes
+
+
+def _lowered_origins(text):
+    """For each character of text.lower(), the index of the character it came from"""
+    origins = []
+    for index, char in enumerate(text):
+        origins.extend([index] * len(char.lower()))
+    return origins
+
+
+def _span(start, length, origins=None):
+    if origins is None:
+        return (start, start + length)
+    return (origins[start], origins[start + length - 1] + 1)
+
+
+class PatternMatcher:
+    """Keyword and phrase matcher compiled once from a pattern dict"""
+
+    def __init__(self, patterns):
+        self.patterns = patterns
+
+        # (bias_type, method, term, lowered term) in the order detections are reported
+        self.entries = []
+        for method, key in (('keyword', 'keywords'), ('phrase', 'phrases')):
+            for bias_type, config in patterns.items():
+                for term in config.get(key, []):
+                    self.entries.append((bias_type, method, term, term.lower()))
+
+        self.terms = sorted({entry[3] for entry in self.entries}, key=len, reverse=True)
+
+        self._regex = None
+        self._prefixes = {}
+        if len(self.terms) > SCAN_THRESHOLD:
+            # The regex only reports the longest term at each offset, so
+            # keep each term's shorter prefix terms to report alongside it
+            self._regex, self._prefixes = _trie_regex(self.terms)
+
+    def _matched_terms(self, text_lower):
+        """Return {lowered term: first offset} for terms that occur in the text"""
+        if self._regex is None:
+            found = {}
+            for term in self.terms:
+                start = text_lower.find(term)
+                if start != -1:
+                    found[term] = start
+            return found
+
+        found = {}
+        for match in self._regex.finditer(text_lower):
+            term = match.group(1)
+            if term not in found:
+                start = match.start()
+                found[term] = start
+                for prefix in self._prefixes[term]:
+                    found.setdefault(prefix, start)
+        return found
+
+    def match(self, text_lower, text=None):
+        """
+        Detect keyword and phrase biases in already-lowercased text.
+        Pass the original text as well to get spans that index into it
+        when lowercasing changed its length (e.g. 'İ' -> 'i̇').
+        """
+        found = self._matched_terms(text_lower)
+        origin = None
+        if text is not None and len(text) != len(text_lower):
+            origin = _lowered_origins(text)
+        return [
+            {
+                'type': bias_type,
+                'method': method,
+                'match': term,
+                'span': _span(found[lowered], len(lowered), origin),
+                'severity': self.patterns[bias_type]['severity']
+            }
+            for bias_type, method, term, lowered in self.entries
+            if lowered in found
+        ]
+
+
+def validate_patterns(patterns):
+    """Check a custom pattern set, raising ValueError on bad input"""
+    if not isinstance(patterns, dict) or not patterns:
+        raise ValueError('Pattern set must be a non-empty object of bias types')
+
+    total_terms = 0
+    for bias_type, config in patterns.items():
+        if not isinstance(config, dict):
+            raise ValueError(f"Pattern config for '{bias_type}' must be an object")
+
+        for key in ('keywords', 'phrases'):
+            terms = config.get(key, [])
+            if not isinstance(terms, list) or not all(isinstance(t, str) and t.strip() for t in terms):
+                raise ValueError(f"'{key}' for '{bias_type}' must be a list of non-empty strings")
+            total_terms += len(terms)
+            if total_terms > MAX_PATTERN_TERMS:
+                raise ValueError(f'Pattern set exceeds {MAX_PATTERN_TERMS} terms')
+
+        for key in ('code', 'description'):
+            value = config.get(key)
+            if value is not None and not isinstance(value, str):
+                raise ValueError(f"'{key}' for '{bias_type}' must be a string")
+
+        severity = config.get('severity')
+        if severity is not None and severity not in VALID_SEVERITIES:
+            raise ValueError(f"Unknown severity '{severity}' for '{bias_type}'")
+
+        if bias_type not in BIAS_PATTERNS and severity is None:
+            raise ValueError(f"New bias type '{bias_type}' needs a severity")
+
+
+def merge_patterns(custom, base=BIAS_PATTERNS):
+    """Layer a custom pattern set on top of the default patterns"""
+    merged = {bias_type: dict(config) for bias_type, config in base.items()}
+
+    for bias_type, config in custom.items():
+        target = merged.setdefault(bias_type, {
+            'description': bias_type.replace('_', ' ').capitalize()
+        })
+        for key in ('keywords', 'phrases'):
+            if key in config:
+                target[key] = list(target.get(key, [])) + list(config[key])
+        for key in ('severity', 'description', 'code'):
+            if key in config:
+                target[key] = config[key]
+
+    return merged
+
+
+class PatternSetCache:
+    """
+    LRU cache of compiled matchers keyed by pattern set content hash,
+    plus an LRU of named sets (evicted sets reload from pattern_dir if
+    they have a file there)
+    """
+
+    def __init__(self, max_size=64, max_named=256, pattern_dir='pattern_sets'):
+        self.max_size = max_size
+        self.max_named = max_named
+        self.pattern_dir = pattern_dir
+        self.named_sets = OrderedDict()
+        self._matchers = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def content_hash(patterns):
+        canonical = json.dumps(patterns, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def register(self, name, patterns):
+        """Register a named pattern set and return its content hash"""
+        validate_patterns(patterns)
+        key = self.content_hash(patterns)
+        with self._lock:
+            # Named sets never change, so they are hashed only here
+            self.named_sets[name] = (patterns, key)
+            self.named_sets.move_to_end(name)
+            while len(self.named_sets) > self.max_named:
+                self.named_sets.popitem(last=False)
+        return key
+
+    def get_named(self, name):
+        """Look up a named set, falling back to pattern_sets/<name>.json"""
+        return self._named_entry(name)[0]
+
+    def named_matcher(self, name):
+        """Compiled matcher for a named set, without re-hashing it"""
+        patterns, key = self._named_entry(name)
+        return self.get_matcher(patterns, key)
+
+    def _named_entry(self, name):
+        with self._lock:
+            if name in self.named_sets:
+                self.named_sets.move_to_end(name)
+                return self.named_sets[name]
+
+        if not re.fullmatch(r'[\w-]+', name):
+            raise ValueError(f"Invalid pattern set name '{name}'")
+
+        path = os.path.join(self.pattern_dir, f'{name}.json')
+        try:
+            with open(path, 'r') as f:
+                patterns = json.load(f)
+        except FileNotFoundError:
+            raise ValueError(f"Unknown pattern set '{name}'")
+
+        key = self.register(name, patterns)
+        return patterns, key
+
+    def get_matcher(self, patterns, key=None):
+        """
+        Return the compiled matcher for defaults merged with a custom set.
+        key: the set's content hash, if already known
+        """
+        if key is None:
+            key = self.content_hash(patterns)
+
+        with self._lock:
+            matcher = self._matchers.get(key)
+            if matcher is not None:
+                self._matchers.move_to_end(key)
+                return matcher
+
+        # Compile outside the lock; a racing duplicate compile is harmless
+        validate_patterns(patterns)
+        matcher = PatternMatcher(merge_patterns(patterns))
+
+        with self._lock:
+            self._matchers[key] = matcher
+            self._matchers.move_to_end(key)
+            while len(self._matchers) > self.max_size:
+                self._matchers.popitem(last=False)
+
+        return matcher
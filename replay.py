@@ -0,0 +1,298 @@
+# replay.py - Replay logged traffic through two detector configurations
+import argparse
+import gzip
+import json
+import math
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from bias_patterns import BIAS_PATTERNS, SEMANTIC_EXAMPLES
+from pattern_matcher import PatternMatcher, merge_patterns, validate_patterns
+
+# Per-process detectors, built once by _init_worker
+_detectors = {}
+
+
+class LatencyHistogram:
+    """Fixed log-spaced buckets, so percentiles need O(1) memory"""
+
+    def __init__(self, low_ms=0.01, high_ms=60000, buckets=400):
+        self.low = math.log(low_ms)
+        self.width = (math.log(high_ms) - self.low) / buckets
+        self.counts = [0] * (buckets + 1)
+        self.total = 0
+
+    def add(self, ms):
+        index = int((math.log(max(ms, 1e-9)) - self.low) / self.width)
+        self.counts[min(max(index, 0), len(self.counts) - 1)] += 1
+        self.total += 1
+
+    def percentile(self, q):
+        if not self.total:
+            return None
+        target = q / 100 * self.total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return math.exp(self.low + (index + 0.5) * self.width)
+        return math.exp(self.low + len(self.counts) * self.width)
+
+    def summary(self):
+        return {f'p{q}': self.percentile(q) for q in (50, 90, 99)}
+
+
+def load_config(spec):
+    """Config from a JSON file path or an inline JSON object"""
+    if spec.strip().startswith('{'):
+        return json.loads(spec)
+    with open(spec, 'r') as f:
+        return json.load(f)
+
+
+def _fill_metadata(patterns):
+    """
+    Validation accepts known types without a severity, which only makes
+    sense for a set merged onto BIAS_PATTERNS; fill such gaps in place
+    """
+    for bias_type, config in patterns.items():
+        base = BIAS_PATTERNS.get(bias_type, {
+            'description': bias_type.replace('_', ' ').capitalize()
+        })
+        for key in ('severity', 'description', 'code'):
+            if key in base:
+                config.setdefault(key, base[key])
+
+
+def load_pattern_files(config):
+    """
+    (patterns, custom_patterns) named by a config, validated; raises
+    ValueError on a bad file. A replacement pattern set takes any
+    severity, description and code it leaves out from BIAS_PATTERNS,
+    and bias types with semantic examples but no entry keep that
+    metadata (without keywords or phrases).
+    """
+    patterns = custom = None
+    if 'patterns' in config:
+        with open(config['patterns'], 'r') as f:
+            patterns = json.load(f)
+        try:
+            validate_patterns(patterns)
+        except ValueError as e:
+            raise ValueError(f"{config['patterns']}: {e}") from None
+        _fill_metadata(patterns)
+        for bias_type in SEMANTIC_EXAMPLES:
+            if bias_type not in patterns:
+                base = BIAS_PATTERNS[bias_type]
+                patterns[bias_type] = {key: base[key] for key in ('severity', 'description', 'code')}
+
+    if 'custom_patterns' in config:
+        with open(config['custom_patterns'], 'r') as f:
+            custom = json.load(f)
+        try:
+            validate_patterns(custom)
+        except ValueError as e:
+            raise ValueError(f"{config['custom_patterns']}: {e}") from None
+
+    return patterns, custom
+
+
+def build_detector(config):
+    """
+    BiasDetector for a replay config. Keys: semantic, model_name,
+    semantic_threshold, semantic_thresholds, patterns (JSON file that
+    replaces BIAS_PATTERNS), custom_patterns (JSON file merged on top
+    of patterns, or of BIAS_PATTERNS when there is no replacement)
+    """
+    from bias_detector import BiasDetector
+
+    detector = BiasDetector(semantic=config.get('semantic', True))
+    if 'model_name' in config:
+        detector.model_name = config['model_name']
+    if 'semantic_threshold' in config:
+        detector.semantic_threshold = config['semantic_threshold']
+    detector.semantic_thresholds.update(config.get('semantic_thresholds', {}))
+
+    # Compile the final pattern set once, so detect_biases needs no custom set
+    patterns, custom = load_pattern_files(config)
+    if custom is not None:
+        patterns = merge_patterns(custom, base=patterns or BIAS_PATTERNS)
+        _fill_metadata(patterns)
+    if patterns is not None:
+        detector.patterns = patterns
+        detector.matcher = PatternMatcher(patterns)
+
+    return detector
+
+
+def _init_worker(config_a, config_b):
+    for name, config in (('a', config_a), ('b', config_b)):
+        detector = build_detector(config)
+        # Load models now, so the load time stays out of the latency numbers
+        if detector.semantic:
+            detector.load_semantic_model()
+        _detectors[name] = detector
+
+
+def _replay_chunk(texts):
+    """Run both configs on each text, alternating which goes first"""
+    rows = []
+    for index, text in enumerate(texts):
+        outcome = {}
+        order = ('a', 'b') if index % 2 == 0 else ('b', 'a')
+        for name in order:
+            detector = _detectors[name]
+            start = time.perf_counter()
+            result = detector.detect_biases(text)
+            elapsed = (time.perf_counter() - start) * 1000
+            outcome[name] = (sorted(result['biases_detected']), result['severity'], elapsed)
+        rows.append((outcome['a'], outcome['b']))
+    return rows
+
+
+def iter_texts(paths):
+    """Stream request texts from JSONL logs (plain or .gz)"""
+    for path in paths:
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    yield None
+                    continue
+                yield record.get('text') if isinstance(record, dict) else None
+
+
+def iter_chunks(texts, size, skipped):
+    chunk = []
+    for text in texts:
+        if not text:
+            skipped[0] += 1
+            continue
+        chunk.append(text)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class ReplayReport:
+    """Running aggregate of differences between configs A and B"""
+
+    def __init__(self):
+        self.requests = 0
+        self.changed = 0
+        self.per_type = defaultdict(Counter)
+        self.severity_changes = Counter()
+        self.latency = {'a': LatencyHistogram(), 'b': LatencyHistogram()}
+
+    def add(self, rows):
+        for (types_a, severity_a, ms_a), (types_b, severity_b, ms_b) in rows:
+            self.requests += 1
+            self.latency['a'].add(ms_a)
+            self.latency['b'].add(ms_b)
+
+            set_a, set_b = set(types_a), set(types_b)
+            if set_a != set_b or severity_a != severity_b:
+                self.changed += 1
+            for bias_type in set_a | set_b:
+                if bias_type in set_a and bias_type in set_b:
+                    self.per_type[bias_type]['both'] += 1
+                elif bias_type in set_a:
+                    self.per_type[bias_type]['only_a'] += 1
+                else:
+                    self.per_type[bias_type]['only_b'] += 1
+            if severity_a != severity_b:
+                self.severity_changes[f'{severity_a}->{severity_b}'] += 1
+
+    def to_dict(self):
+        return {
+            'requests': self.requests,
+            'changed': self.changed,
+            'per_type': {t: dict(c) for t, c in sorted(self.per_type.items())},
+            'severity_changes': dict(self.severity_changes.most_common()),
+            'latency_ms': {name: h.summary() for name, h in self.latency.items()}
+        }
+
+
+def replay(paths, config_a, config_b, workers=2, chunk_size=200, limit=None):
+    """Replay logs through both configs across worker processes"""
+    # Fail here on a bad pattern file rather than in every worker
+    load_pattern_files(config_a)
+    load_pattern_files(config_b)
+
+    report = ReplayReport()
+    skipped = [0]
+
+    texts = iter_texts(paths)
+    if limit:
+        texts = (text for i, text in zip(range(limit), texts))
+    chunks = iter_chunks(texts, chunk_size, skipped)
+
+    # Keep only a couple of chunks per worker in flight to bound memory
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(config_a, config_b)) as pool:
+        pending = set()
+        for chunk in chunks:
+            pending.add(pool.submit(_replay_chunk, chunk))
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    report.add(future.result())
+        for future in pending:
+            report.add(future.result())
+
+    result = report.to_dict()
+    result['skipped_records'] = skipped[0]
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare two detector configs on logged traffic')
+    parser.add_argument('logs', nargs='+', help='JSONL request logs recorded with include_text=True')
+    parser.add_argument('--a', default='{}', help='config A: JSON file or inline JSON (default: current)')
+    parser.add_argument('--b', required=True, help='config B: JSON file or inline JSON')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--chunk-size', type=int, default=200)
+    parser.add_argument('--limit', type=int, help='stop after this many log records')
+    parser.add_argument('--output', help='save the report as JSON')
+    args = parser.parse_args()
+
+    start = time.time()
+    try:
+        report = replay(args.logs, load_config(args.a), load_config(args.b),
+                        args.workers, args.chunk_size, args.limit)
+    except ValueError as e:
+        parser.error(str(e))
+    elapsed = time.time() - start
+
+    print(f"Replayed {report['requests']} requests in {elapsed:.1f}s "
+          f"({report['skipped_records']} records without text skipped)")
+    print(f"Results changed for {report['changed']} requests\n")
+
+    print(f"{'Bias type':<26}{'both':>8}{'only A':>8}{'only B':>8}")
+    for bias_type, counts in report['per_type'].items():
+        print(f"{bias_type:<26}{counts.get('both', 0):>8}{counts.get('only_a', 0):>8}"
+              f"{counts.get('only_b', 0):>8}")
+
+    if report['severity_changes']:
+        print("\nSeverity changes (A->B):")
+        for change, count in report['severity_changes'].items():
+            print(f"  {change:<20}{count:>8}")
+
+    print(f"\n{'Latency ms':<12}{'p50':>10}{'p90':>10}{'p99':>10}")
+    for name, summary in report['latency_ms'].items():
+        cells = ''.join(f"{summary[p]:>10.2f}" if summary[p] is not None else f"{'-':>10}"
+                        for p in ('p50', 'p90', 'p99'))
+        print(f"{name.upper():<12}{cells}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved report to {args.output}")
@@ -0,0 +1,172 @@
+# request_log.py - Non-blocking request/result logging to rotating JSONL
+import atexit
+import hashlib
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+def text_hash(text):
+    """Stable short fingerprint of a request text"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def _without_text(result):
+    """
+    Copy of a detection/correction/analysis result minus echoed input
+    text. The corrected text is a rewrite of the input, so only its hash
+    and length are kept.
+    """
+    if not isinstance(result, dict):
+        return result
+    stripped = {}
+    for key, value in result.items():
+        if key in ('text', 'original'):
+            continue
+        if key == 'corrected' and isinstance(value, str):
+            stripped['corrected_hash'] = text_hash(value)
+            stripped['corrected_length'] = len(value)
+            continue
+        stripped[key] = _without_text(value)
+    return stripped
+
+
+class RequestLogger:
+    """
+    Request threads only enqueue a record (never touching disk); a
+    background writer serializes and appends records in batches,
+    rotating the file by size and age. When the queue is full the
+    record is dropped and counted instead of blocking.
+    """
+
+    def __init__(self, path='logs/requests.jsonl', include_text=False,
+                 sample_rate=1.0, max_queue=10000, batch_size=500,
+                 flush_interval=1.0, max_bytes=50 * 1024 * 1024,
+                 rotate_interval=24 * 3600):
+        self.path = path
+        self.include_text = include_text
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+
+        self.stats = {'logged': 0, 'written': 0, 'dropped': 0, 'sampled_out': 0}
+        self._stats_lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._file = None
+        self._opened_at = 0
+
+        self._writer = threading.Thread(target=self._run, name='request-log-writer', daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def log(self, endpoint, text, result, timings=None):
+        """Queue one request record; never blocks the caller"""
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            self._count('sampled_out')
+            return
+
+        record = {
+            'ts': datetime.now().isoformat(),
+            'endpoint': endpoint,
+            'text_hash': text_hash(text),
+            'text_length': len(text),
+            'result': result,
+            'timings_ms': timings or {}
+        }
+        if self.include_text:
+            record['text'] = text
+
+        try:
+            self._queue.put_nowait(record)
+            self._count('logged')
+        except queue.Full:
+            self._count('dropped')
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._opened_at = time.monotonic()
+
+    def _rotate_if_needed(self):
+        too_big = self._file.tell() >= self.max_bytes
+        too_old = time.monotonic() - self._opened_at >= self.rotate_interval
+        if not (too_big or too_old) or self._file.tell() == 0:
+            return
+
+        self._file.close()
+        base, ext = os.path.splitext(self.path)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        target = f'{base}-{stamp}{ext}'
+        suffix = 1
+        while os.path.exists(target):
+            target = f'{base}-{stamp}-{suffix}{ext}'
+            suffix += 1
+        os.replace(self.path, target)
+        self._open()
+
+    def _write(self, batch):
+        if self._file is None:
+            self._open()
+        lines = []
+        for record in batch:
+            if not self.include_text:
+                record['result'] = _without_text(record['result'])
+            try:
+                lines.append(json.dumps(record, default=str))
+            except (TypeError, ValueError) as e:
+                logger.error(f"Unserializable log record: {str(e)}")
+        if lines:
+            self._file.write('\n'.join(lines) + '\n')
+            self._file.flush()
+            self._count('written', len(lines))
+        self._rotate_if_needed()
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0.01)))
+            except queue.Empty:
+                pass
+
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._flush(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+        self._flush(batch)
+
+    def _flush(self, batch):
+        if not batch:
+            return
+        try:
+            self._write(batch)
+        except OSError as e:
+            logger.error(f"Request log write failed: {str(e)}")
+
+    def close(self):
+        """Flush everything queued and stop the writer"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._writer.join(timeout=5)
+        if self._file is not None:
+            self._file.close()
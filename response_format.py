@@ -0,0 +1,102 @@
+# response_format.py - Slim payloads and content negotiation for the API
+import json
+
+from bias_patterns import BIAS_PATTERNS
+
+# Optional faster encoders
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Bump when the slim payload layout changes
+RESPONSE_VERSION = 1
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack')
+
+METHOD_CODES = {
+    'keyword': 'k',
+    'phrase': 'p',
+    'semantic': 's',
+    'linguistic': 'l'
+}
+
+
+def bias_code(bias_type, patterns=BIAS_PATTERNS):
+    """Short code for a bias type, falling back to the type name"""
+    return patterns.get(bias_type, {}).get('code', bias_type)
+
+
+def bias_type_for_code(code, patterns=BIAS_PATTERNS):
+    """Inverse of bias_code"""
+    for bias_type, config in patterns.items():
+        if config.get('code', bias_type) == code:
+            return bias_type
+    return code
+
+
+def slim_detection(results, all_biases, patterns=BIAS_PATTERNS):
+    """
+    Compact detection payload: no text echo or reasoning strings,
+    bias types as codes and matches as [code, method, start, end]
+    """
+    spans = []
+    for bias in all_biases:
+        start, end = bias.get('span', (None, None))
+        spans.append([
+            bias_code(bias['type'], patterns),
+            METHOD_CODES.get(bias['method'], bias['method']),
+            start,
+            end
+        ])
+
+    return {
+        'v': RESPONSE_VERSION,
+        'biases': [bias_code(b, patterns) for b in results['biases_detected']],
+        'severity': results['severity'],
+        'confidence': results['confidence'],
+        'spans': spans
+    }
+
+
+def slim_correction(correction, patterns=BIAS_PATTERNS):
+    """Compact correction payload without the original text echo"""
+    if correction is None:
+        return None
+
+    return {
+        'v': RESPONSE_VERSION,
+        'corrected': correction['corrected'],
+        'biases_removed': [bias_code(b, patterns) for b in correction['biases_removed']],
+        'recommendations': correction['recommendations']
+    }
+
+
+def negotiate(accept_mimetypes):
+    """Pick a response mimetype from the Accept header, or None if unsupported"""
+    offered = [JSON_MIMETYPE]
+    if msgpack is not None:
+        offered.extend(MSGPACK_MIMETYPES)
+
+    best = accept_mimetypes.best_match(offered)
+    if best is None and accept_mimetypes.best_match(MSGPACK_MIMETYPES):
+        # Client only accepts MessagePack but the encoder is not installed
+        return None
+    return best or JSON_MIMETYPE
+
+
+def encode(payload, mimetype):
+    """Serialize a payload with the fastest available encoder"""
+    if mimetype in MSGPACK_MIMETYPES:
+        return msgpack.packb(payload, use_bin_type=True)
+
+    if orjson is not None:
+        return orjson.dumps(payload)
+
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
@@ -0,0 +1,75 @@
+# startup_benchmark.py - Import time and memory of each detector mode
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Each mode runs in a fresh interpreter so module caches don't leak between them
+MODES = {
+    'lexical': (
+        "from lexical_detector import LexicalDetector\n"
+        "detector = LexicalDetector()\n"
+    ),
+    'semantic-off': (
+        "from bias_detector import BiasDetector\n"
+        "detector = BiasDetector(semantic=False)\n"
+    ),
+    'full': (
+        "from bias_detector import BiasDetector\n"
+        "detector = BiasDetector()\n"
+        "detector.load_semantic_model()\n"
+    )
+}
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+{setup}
+ready = time.perf_counter()
+detector.detect_biases("Based on recent trends, this investment will definitely succeed.")
+done = time.perf_counter()
+print(json.dumps({{
+    'startup_ms': (ready - start) * 1000,
+    'first_detect_ms': (done - ready) * 1000,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'torch_imported': 'torch' in sys.modules
+}}))
+"""
+
+
+def measure(mode, repeats=3):
+    """Best-of-N startup time, plus memory and whether torch was pulled in"""
+    runs = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE.format(setup=MODES[mode])],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return min(runs, key=lambda run: run['startup_ms'])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Measure detector start-up cost per mode')
+    parser.add_argument('--modes', nargs='+', default=list(MODES), choices=list(MODES))
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--output', help='save results as JSON')
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'mode':<14}{'startup ms':>12}{'1st detect ms':>15}{'max RSS MB':>12}  torch")
+    for mode in args.modes:
+        try:
+            results[mode] = measure(mode, args.repeats)
+        except subprocess.CalledProcessError as e:
+            print(f"{mode:<14}failed: {e.stderr.strip().splitlines()[-1]}")
+            continue
+        r = results[mode]
+        print(f"{mode:<14}{r['startup_ms']:>12.1f}{r['first_detect_ms']:>15.1f}"
+              f"{r['max_rss_mb']:>12.1f}  {'yes' if r['torch_imported'] else 'no'}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
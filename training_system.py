@@ -1,18 +1,27 @@
 # training_system.py
 import json
+import os
 import pandas as pd
 from datetime import datetime
 import random
+from dedup import Deduplicator
 
 class BiasTrainingSystem:
     def __init__(self):
         self.training_data = []
         self.performance_log = []
+        self.deduplicator = None
+        # Duplicate counts for train_evaluation_metrics, and the file
+        # state training_data was loaded from; reset when the data changes
+        self._duplicate_counts = None
+        self._loaded_from = None
         
-    def generate_synthetic_examples(self, num_examples=1000):
+    def generate_synthetic_examples(self, num_examples=1000, dedupe=False, max_attempts=None):
         """
         Generate synthetic biased text examples for training
         This is KEY - creating your own training data!
+        dedupe: skip exact and near-duplicate texts (may return fewer
+        than num_examples once the template space is exhausted)
         """
         
         # Templates for each bias type
@@ -101,7 +110,14 @@ class BiasTrainingSystem:
         
         examples = []
         
-        for _ in range(num_examples):
+        dedup = self._get_deduplicator() if dedupe else None
+        if max_attempts is None:
+            max_attempts = num_examples * 10 if dedupe else num_examples
+        attempts = 0
+        
+        while len(examples) < num_examples and attempts < max_attempts:
+            attempts += 1
+            
             # Randomly select a bias type and template
             bias_type = random.choice(list(templates.keys()))
             template = random.choice(templates[bias_type])
@@ -115,6 +131,9 @@ class BiasTrainingSystem:
                         random.choice(fillers[placeholder])
                     )
             
+            if dedup is not None and dedup.is_duplicate(text):
+                continue
+            
             # Generate corrected version
             corrected = self._auto_correct(text, bias_type)
             
@@ -127,8 +146,28 @@ class BiasTrainingSystem:
             })
         
         self.training_data.extend(examples)
+        self._data_changed()
         return examples
     
+    def _get_deduplicator(self):
+        """Deduplicator seeded with the examples already held"""
+        if self.deduplicator is None:
+            self.deduplicator = Deduplicator()
+            for example in self.training_data:
+                self.deduplicator.check(example['biased_text'])
+        return self.deduplicator
+    
+    def dedupe_training_data(self):
+        """Drop exact and near-duplicate examples, keeping first occurrences"""
+        self.deduplicator = Deduplicator()
+        self.training_data = list(self.deduplicator.filter(self.training_data))
+        self._data_changed()
+        return self.deduplicator.stats
+    
+    def _data_changed(self):
+        self._duplicate_counts = None
+        self._loaded_from = None
+    
     def _auto_correct(self, biased_text, bias_type):
         """Auto-generate corrected version"""
         corrected = biased_text
@@ -175,8 +214,16 @@ class BiasTrainingSystem:
     def load_training_data(self, filename='bias_training_data.json'):
         """Load training data"""
         try:
+            info = os.stat(filename)
+            stamp = (os.path.abspath(filename), info.st_mtime_ns, info.st_size)
+            if stamp == self._loaded_from:
+                # Already holding exactly this file; keep the cached metrics
+                return
             with open(filename, 'r') as f:
                 self.training_data = json.load(f)
+            self.deduplicator = None
+            self._duplicate_counts = None
+            self._loaded_from = stamp
             print(f"Loaded {len(self.training_data)} training examples")
         except FileNotFoundError:
             print("No training data found. Generate new data first.")
@@ -190,7 +237,9 @@ class BiasTrainingSystem:
             'total_examples': len(self.training_data),
             'bias_distribution': {},
             'avg_correction_length': 0,
-            'unique_patterns': 0
+            'unique_patterns': 0,
+            'exact_duplicates': 0,
+            'near_duplicates': 0
         }
         
         # Count bias types
@@ -198,6 +247,19 @@ class BiasTrainingSystem:
             bias = example['bias_type']
             metrics['bias_distribution'][bias] = metrics['bias_distribution'].get(bias, 0) + 1
         
+        # MinHashing the corpus is the expensive part, so reuse the counts
+        # until the data changes
+        if self._duplicate_counts is None:
+            dedup = Deduplicator()
+            for example in self.training_data:
+                dedup.check(example['biased_text'])
+            self._duplicate_counts = {
+                'unique_patterns': dedup.stats['unique'],
+                'exact_duplicates': dedup.stats['exact_duplicates'],
+                'near_duplicates': dedup.stats['near_duplicates']
+            }
+        metrics.update(self._duplicate_counts)
+        
         # Calculate average correction length difference
         length_diffs = []
         for example in self.training_data:
@@ -230,4 +292,6 @@ if __name__ == "__main__":
     metrics = trainer.train_evaluation_metrics()
     print(f"\nTraining Data Metrics:")
     print(f"Total examples: {metrics['total_examples']}")
-    print(f"Bias distribution: {metrics['bias_distribution']}")
\ No newline at end of file
+    print(f"Bias distribution: {metrics['bias_distribution']}")
+    print(f"Unique patterns: {metrics['unique_patterns']} "
+          f"({metrics['exact_duplicates']} exact, {metrics['near_duplicates']} near duplicates)")
\ No newline at end of file